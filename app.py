@@ -1,38 +1,57 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
-from datetime import datetime, timezone, date
+from datetime import datetime, timezone
 from datetime import timedelta
 import time
 import numpy as np
-from deep_translator import GoogleTranslator
-import plotly.express as px
 import plotly.graph_objects as go
-import re
+import ast
+import html
+import json
+import pathlib
 import logging
 import sqlite3
+import threading
+import os
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 import bcrypt
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+UTC = timezone.utc
+
 # --- Database Functions ---
+@st.cache_resource(show_spinner=False)
+def get_conn():
+    """Open the shared SQLite connection once per process."""
+    conn = sqlite3.connect("infibit.db", check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-64000;
+        PRAGMA mmap_size=268435456;
+        PRAGMA foreign_keys=ON;
+    """)
+    logger.debug("SQLite connection established")
+    return conn
+
 @contextmanager
 def get_db_connection():
-    """Manage SQLite database connections with proper commit and close."""
+    """Provide the shared autocommit SQLite connection."""
     try:
-        conn = sqlite3.connect("infibit.db", check_same_thread=False)
-        conn.row_factory = sqlite3.Row
-        logger.debug("SQLite connection established")
-        yield conn
-        conn.commit()
+        yield get_conn()
     except sqlite3.Error as e:
         logger.error(f"Error accessing database: {e}")
         raise
-    finally:
-        conn.close()
 
 def init_db():
     """Initialize database with schema for users."""
@@ -46,7 +65,7 @@ def init_db():
                     name TEXT,
                     password_hash TEXT NOT NULL,
                     created_at TEXT NOT NULL
-                )
+                ) WITHOUT ROWID
             """)
         logger.info("Database initialized successfully.")
     except sqlite3.Error as e:
@@ -99,6 +118,17 @@ def load_user_by_wallet(wallet_address):
         logger.error(f"Error loading user {wallet_address}: {e}")
         return None
 
+def email_registered(email):
+    """Check whether an account already uses this email."""
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM users WHERE email = ? LIMIT 1", (email,))
+            return cursor.fetchone() is not None
+    except sqlite3.Error as e:
+        logger.error(f"Error checking user {email}: {e}")
+        return False
+
 def save_user(wallet_address, name, email, password, created_at):
     """Save a new user to the database with hashed password."""
     try:
@@ -114,9 +144,50 @@ def save_user(wallet_address, name, email, password, created_at):
         logger.error(f"Failed to save user {email}: {e}")
         raise
 
+def update_password_hash(email, password):
+    """Rehash a user's password with the current work factor."""
+    try:
+        password_hash = hash_password(password)
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE users SET password_hash = ? WHERE email = ?
+            """, (password_hash, email))
+        logger.info(f"Password hash for {email} upgraded to {BCRYPT_ROUNDS} rounds")
+        return password_hash
+    except sqlite3.Error as e:
+        logger.error(f"Failed to update password hash for {email}: {e}")
+        return None
+
 # --- Password Hashing ---
+def read_bcrypt_rounds(default=10):
+    """Work factor from the BCRYPT_ROUNDS env var, clamped to bcrypt's supported 4-31 range."""
+    value = os.getenv("BCRYPT_ROUNDS")
+    if value is None:
+        return default
+    try:
+        rounds = int(value)
+    except ValueError:
+        logger.warning(f"Ignoring non-numeric BCRYPT_ROUNDS={value!r}; using {default}")
+        return default
+    if not 4 <= rounds <= 31:
+        clamped = min(max(rounds, 4), 31)
+        logger.warning(f"BCRYPT_ROUNDS={rounds} is outside 4-31; using {clamped}")
+        return clamped
+    return rounds
+
+# Work factor for new hashes; set BCRYPT_ROUNDS=12 in production
+BCRYPT_ROUNDS = read_bcrypt_rounds()
+
 def hash_password(password):
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode("utf-8")
+
+def needs_rehash(password_hash):
+    """Check whether a stored hash ($2b$<rounds>$...) uses a different work factor than BCRYPT_ROUNDS."""
+    try:
+        return int(password_hash.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
 
 def verify_password(password, password_hash):
     try:
@@ -125,10 +196,41 @@ def verify_password(password, password_hash):
         logger.error(f"Password verification error: {e}")
         return False
 
+# --- HTTP Helpers ---
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """Shared requests session so API calls reuse keep-alive connections."""
+    session = requests.Session()
+    session.headers.update({"Accept-Encoding": "gzip", "User-Agent": "infibit/1.0"})
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry))
+    return session
+
+@st.cache_resource(show_spinner=False)
+def get_io_pool():
+    """Process-wide pool for API calls; its size also caps concurrent requests to each provider."""
+    return ThreadPoolExecutor(max_workers=16, thread_name_prefix="infibit-io")
+
+def map_concurrently(func, items):
+    """Run an I/O-bound function over items on the shared pool, preserving order."""
+    ctx = get_script_run_ctx()
+
+    def run(item):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return func(item)
+
+    return list(get_io_pool().map(run, items))
+
 # --- Wallet Address Validation ---
 def validate_wallet_address(address):
-    pattern = r'^(bc1|[13])[a-zA-Z0-9]{25,61}$'
-    return re.match(pattern, address) is not None
+    # Equivalent to ^(bc1|[13])[a-zA-Z0-9]{25,61}$ without going through the regex engine
+    if address.startswith("bc1"):
+        body = address[3:]
+    elif address[:1] in ("1", "3"):
+        body = address[1:]
+    else:
+        return False
+    return 25 <= len(body) <= 61 and body.isascii() and body.isalnum()
 
 # Initialize database
 try:
@@ -146,74 +248,12 @@ st.set_page_config(
 )
 
 # --- CSS Styling ---
-st.markdown(
-    """
-    <style>
-        @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-        body {
-            background-color: #FFFFFF;
-            color: #1A1A1A;
-            font-family: 'Inter', sans-serif;
-        }
-        .main {
-            padding: 20px;
-            max-width: 1400px;
-            margin: 0 auto;
-        }
-        .stMetric {
-            background-color: #FFFFFF;
-            border: 1px solid #E0E0E0;
-            border-radius: 8px;
-            padding: 15px;
-            box-shadow: 0 1px 3px rgba(0,0,0,0.05);
-            margin-bottom: 15px;
-        }
-        .stMetric label {
-            font-size: 0.9em;
-            font-weight: bold;
-            color: #4A4A4A;
-        }
-        .stMetric .metric-value {
-            font-size: 1.3em;
-            font-weight: bold;
-            color: #333;
-        }
-        h1, h2, h3 {
-            font-family: 'Inter', sans-serif;
-            color: #1A1A1A;
-            font-weight: bold;
-        }
-        h1 {
-            font-size: 2.2em;
-        }
-        h2 {
-            font-size: 1.5em;
-        }
-        .stButton>button {
-            background-color: #007BFF;
-            color: white;
-            border-radius: 6px;
-            padding: 8px 16px;
-            border: none;
-        }
-        .stDataFrame th {
-            background-color: #F5F6F5;
-            color: #333;
-            padding: 12px;
-            font-weight: bold;
-        }
-        .stDataFrame td {
-            padding: 4px 12px;
-            border-bottom: 2px solid #E0E0E0;
-        }
-        .sidebar .sidebar-content {
-            background-color: #FFF;
-            box-shadow: 2px 0 5px rgba(0,0,0,0.05);
-        }
-    </style>
-    """,
-    unsafe_allow_html=True
-)
+@st.cache_resource(show_spinner=False)
+def load_css():
+    """Read the minified stylesheet once per process and wrap it in its <style> tag."""
+    return f"<style>{(pathlib.Path(__file__).parent / 'styles.min.css').read_text(encoding='utf-8')}</style>"
+
+st.markdown(load_css(), unsafe_allow_html=True)
 
 # --- Language Map ---
 LANGUAGE_OPTIONS = {
@@ -232,16 +272,323 @@ if "language" not in st.session_state:
     st.session_state.language = "en"
 
 # --- Translate Function ---
+@st.cache_resource(show_spinner=False)
+def collect_ui_strings():
+    """Collect every string literal passed to t() in this script, parsed once per process."""
+    with open(__file__, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    strings = []
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Name)
+            and node.func.id == "t"
+            and node.args
+            and isinstance(node.args[0], ast.Constant)
+            and isinstance(node.args[0].value, str)
+            and node.args[0].value not in strings
+        ):
+            strings.append(node.args[0].value)
+    return tuple(strings)
+
+@st.cache_resource(show_spinner=False)
+def get_translator(language):
+    """One GoogleTranslator instance per target language."""
+    from deep_translator import GoogleTranslator
+
+    return GoogleTranslator(source="en", target=language)
+
+# deep_translator rejects payloads over 5000 characters
+TRANSLATION_BATCH_CHARS = 4500
+
+def batch_ui_strings(strings, limit=TRANSLATION_BATCH_CHARS):
+    """Group strings into newline-joined batches that stay under the translator's size limit."""
+    batches, current, size = [], [], 0
+    for text in strings:
+        if current and size + len(text) + 1 > limit:
+            batches.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text) + 1
+    if current:
+        batches.append(current)
+    return batches
+
+TRANSLATIONS_DIR = pathlib.Path(__file__).parent / "translations"
+
+def load_translation_file(language):
+    """Previously persisted translations for a language, or {} if none are usable."""
+    try:
+        return json.loads((TRANSLATIONS_DIR / f"{language}.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+def save_translation_file(language, translations):
+    """Persist translations via a temp file and rename so readers never see a partial file."""
+    path = TRANSLATIONS_DIR / f"{language}.json"
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        TRANSLATIONS_DIR.mkdir(exist_ok=True)
+        tmp_path.write_text(json.dumps(translations, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not persist {language} translations: {e}")
+
+class IncompleteTranslationError(Exception):
+    """Raised when some UI strings could not be translated; carries the ones that were."""
+
+    def __init__(self, language, partial):
+        super().__init__(f"Translation to {language} is incomplete")
+        self.partial = partial
+
+@st.cache_resource(ttl=86400, show_spinner=False)
+def get_translations(language):
+    """Translate UI strings missing from the on-disk cache in as few requests as possible.
+
+    The returned dict is shared across sessions and must not be mutated. Raises
+    IncompleteTranslationError if any batch fails, so a partial result is never cached.
+    """
+    translations = load_translation_file(language)
+    cached_count = len(translations)
+    complete = True
+    for batch in batch_ui_strings([text for text in collect_ui_strings() if text not in translations]):
+        try:
+            lines = get_translator(language).translate("\n".join(batch)).split("\n")
+        except Exception as e:
+            logger.error(f"Translation error: {e}")
+            complete = False
+            continue
+        if len(lines) != len(batch):
+            logger.warning(f"Translation to {language} returned {len(lines)} lines, expected {len(batch)}")
+            complete = False
+            continue
+        translations.update((text, line.strip()) for text, line in zip(batch, lines))
+    if len(translations) > cached_count:
+        save_translation_file(language, translations)
+    if not complete:
+        raise IncompleteTranslationError(language, translations)
+    return translations
+
+# Partial maps for languages whose translation failed in this run. Streamlit rebuilds module globals
+# on every full rerun, so a failure is retried on the next rerun instead of once per t() call.
+failed_translations = {}
+
 def t(text):
-    if st.session_state.language == "en":
+    language = st.session_state.language
+    if language == "en":
         return text
+    if language in failed_translations:
+        return failed_translations[language].get(text, text)
     try:
-        return GoogleTranslator(source="en", target=st.session_state.language).translate(text)
-    except Exception as e:
-        logger.error(f"Translation error: {e}")
-        return text
+        return get_translations(language).get(text, text)
+    except IncompleteTranslationError as e:
+        failed_translations[language] = e.partial
+        return e.partial.get(text, text)
+
+# --- Dashboard Helpers ---
+TX_PAGE_SIZE = 200
+TRANSACTION_COLUMNS = ("Date", "Type", "BTC", "USD Value", "Price at Tx", "Txid", "Confirmed", "Counterparty")
+PLOTLY_CONFIG = {"displaylogo": False, "scrollZoom": False, "responsive": True}
+STATIC_PLOTLY_CONFIG = {"staticPlot": True, "displayModeBar": False}
+VOLUME_WEEKLY_THRESHOLD = 2000
+CHART_LAYOUT = {"template": "plotly_white", "uirevision": "keep"}
+
+METRIC_CARD = (
+    "<div class='metric-card' title='{help}'>"
+    "<div class='metric-label'>{label}</div>"
+    "<div class='metric-value'>{value}</div>"
+    "{delta}"
+    "</div>"
+)
+
+def render_metric_grid(metrics):
+    """Render (label, value, help, delta_pct) tuples as one HTML grid in a single markdown call."""
+    cards = []
+    for label, value, help_text, delta in metrics:
+        delta_html = ""
+        if delta is not None:
+            direction = "negative" if delta < 0 else "positive"
+            delta_html = f"<div class='metric-delta {direction}'>{delta:.2f}%</div>"
+        cards.append(METRIC_CARD.format(
+            label=html.escape(label),
+            value=html.escape(value),
+            help=html.escape(help_text, quote=True),
+            delta=delta_html
+        ))
+    st.markdown(f"<div class='metric-grid'>{''.join(cards)}</div>", unsafe_allow_html=True)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_summary_df(net_btc, wallet_value, invested, gain, gain_pct, volatility, sharpe_ratio, currency, language):
+    """Build the Summary Metrics table as numeric values plus a unit column; language keys the cache for the translated labels."""
+    return pd.DataFrame({
+        t("Metric"): [
+            t("Bitcoin Balance"),
+            t("Current Value"),
+            t("Total Invested"),
+            t("Profit/Loss"),
+            t("ROI"),
+            t("Volatility"),
+            t("Sharpe Ratio")
+        ],
+        t("Value"): [
+            round(float(net_btc), 8),
+            round(float(wallet_value), 2),
+            round(float(invested), 2),
+            round(float(gain), 2),
+            round(float(gain_pct), 2),
+            round(float(volatility), 2),
+            round(float(sharpe_ratio), 2)
+        ],
+        t("Unit"): ["BTC", currency, currency, currency, "%", "%", ""]
+    })
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def compute_portfolio_value(df, multiplier):
+    """Daily market value of the running BTC balance and cumulative cost basis."""
+    signed_btc = df["BTC"].where(df["Type"] == "IN", -df["BTC"])
+    signed_usd = df["USD Value"].where(df["Type"] == "IN", -df["USD Value"])
+    daily = pd.DataFrame({"Date": df["Date"], "btc": signed_btc, "usd": signed_usd}).groupby("Date").sum().cumsum()
+    daily_price = df.groupby("Date")["Price at Tx"].first()
+    return pd.DataFrame({
+        "Date": daily.index,
+        "Market Value": (daily["btc"] * daily_price * multiplier).to_numpy(),
+        "Cost Basis": (daily["usd"] * multiplier).to_numpy(),
+    })
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def compute_risk_metrics(prices, market_values, gain_pct):
+    """Annualized volatility, period return, Sharpe ratio and max drawdown from raw price/value arrays."""
+    volatility = (np.diff(prices) / prices[:-1]).std(ddof=1) * np.sqrt(252) * 100 if prices.size > 2 else 0
+    peaks = np.maximum.accumulate(market_values)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdowns = (market_values - peaks) / peaks
+    drawdowns = drawdowns[np.isfinite(drawdowns)]
+    return {
+        "volatility": float(volatility),
+        "btc_return": float((prices[-1] / prices[0] - 1) * 100) if prices.size else 0.0,
+        "sharpe_ratio": float((gain_pct / volatility) * np.sqrt(252)) if volatility != 0 else 0.0,
+        "max_drawdown": float(drawdowns.min() * 100) if drawdowns.size else 0.0,
+    }
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_daily_activity(filtered_df):
+    """Total BTC moved and number of transactions per day, in one bincount pass."""
+    days, day_ids = np.unique(filtered_df["Date"].to_numpy(), return_inverse=True)
+    return pd.DataFrame({
+        "Date": days,
+        "BTC": np.bincount(day_ids, weights=filtered_df["BTC"].to_numpy(), minlength=days.size),
+        "Count": np.bincount(day_ids, minlength=days.size),
+    })
+
+@st.cache_data(ttl=300, show_spinner=False)
+def to_csv_bytes(df, multiplier=1.0):
+    """Serialize transactions to UTF-8 CSV with USD Value converted to the selected currency."""
+    return df.assign(**{"USD Value": df["USD Value"] * multiplier}).to_csv(index=False).encode("utf-8")
+
+def lttb_indices(x, y, threshold=1000):
+    """Row positions kept by Largest-Triangle-Three-Buckets downsampling."""
+    n = len(x)
+    if n <= threshold or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # First and last points are always kept; the rest are split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    indices = np.empty(threshold, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(areas.argmax())
+        indices[i + 1] = a
+    return indices
+
+# Figure builders return plain dicts so the cache stores and copies them cheaply
+@st.cache_data(ttl=300, show_spinner=False)
+def build_volume_figure(daily_activity, language):
+    """Bar chart of daily BTC volume, binned weekly for long histories; language keys the cache."""
+    if len(daily_activity) > VOLUME_WEEKLY_THRESHOLD:
+        daily_activity = daily_activity.set_index("Date").resample("W")["BTC"].sum().reset_index()
+    fig_volume = go.Figure()
+    fig_volume.add_trace(
+        go.Bar(
+            x=daily_activity["Date"],
+            y=daily_activity["BTC"],
+            name=t("BTC Volume"),
+            marker_color="#007BFF",
+            marker_line_width=0
+        )
+    )
+    fig_volume.update_layout(
+        title=t("Transaction Volume Over Time"),
+        xaxis_title=t("Date"),
+        yaxis_title=t("BTC"),
+        **CHART_LAYOUT
+    )
+    return fig_volume.to_dict()
+
+@st.cache_data(ttl=300, show_spinner=False)
+def build_frequency_figure(daily_activity, language):
+    """Line chart of daily transaction counts, LTTB-downsampled."""
+    freq_df = daily_activity.iloc[
+        lttb_indices(daily_activity["Date"].astype("int64"), daily_activity["Count"])
+    ]
+    fig_freq = go.Figure()
+    fig_freq.add_trace(
+        go.Scattergl(
+            x=freq_df["Date"],
+            y=freq_df["Count"],
+            mode="lines+markers",
+            name=t("Transaction Count"),
+            line=dict(color="#FF5733")
+        )
+    )
+    fig_freq.update_layout(
+        title=t("Transaction Frequency Over Time"),
+        xaxis_title=t("Date"),
+        yaxis_title=t("Number of Transactions"),
+        **CHART_LAYOUT
+    )
+    return fig_freq.to_dict()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def build_portfolio_figure(value_df, currency, language):
+    """Market value vs cost basis lines, LTTB-downsampled."""
+    value_x = value_df["Date"].astype("int64")
+    market_df = value_df.iloc[lttb_indices(value_x, value_df["Market Value"])]
+    cost_df = value_df.iloc[lttb_indices(value_x, value_df["Cost Basis"])]
+    fig_portfolio = go.Figure()
+    fig_portfolio.add_trace(
+        go.Scattergl(
+            x=market_df["Date"],
+            y=market_df["Market Value"],
+            name=t("Market Value"),
+            line=dict(color="#007BFF")
+        )
+    )
+    fig_portfolio.add_trace(
+        go.Scattergl(
+            x=cost_df["Date"],
+            y=cost_df["Cost Basis"],
+            name=t("Cost Basis"),
+            line=dict(color="#FF5733")
+        )
+    )
+    fig_portfolio.update_layout(
+        title=t("Portfolio Value vs Cost Basis"),
+        xaxis_title=t("Date"),
+        yaxis_title=currency,
+        **CHART_LAYOUT
+    )
+    return fig_portfolio.to_dict()
 
 # --- Session State Initialization ---
+now_utc = datetime.now(UTC)
+today = now_utc.date()
 if "user" not in st.session_state:
     st.session_state.user = None
 if "language" not in st.session_state:
@@ -250,6 +597,8 @@ if "currency" not in st.session_state:
     st.session_state.currency = "USD"
 if "authenticated" not in st.session_state:
     st.session_state.authenticated = False
+if "tx_page" not in st.session_state:
+    st.session_state.tx_page = 0
 
 # --- Sidebar ---
 with st.sidebar:
@@ -273,6 +622,8 @@ with st.sidebar:
                     if login_email and login_password:
                         user = load_user_by_email(login_email)
                         if user and verify_password(login_password, user["password_hash"]):
+                            if needs_rehash(user["password_hash"]):
+                                user["password_hash"] = update_password_hash(login_email, login_password) or user["password_hash"]
                             st.session_state.user = user
                             st.session_state.authenticated = True
                             st.success(t("Login successful! Accessing dashboard..."))
@@ -295,6 +646,8 @@ with st.sidebar:
                         st.error(t("Invalid Bitcoin address (must start with 'bc1', '1', or '3', 26–62 characters)."))
                     elif not signup_email:
                         st.error(t("Please provide an email address."))
+                    elif email_registered(signup_email):
+                        st.error(t("An account with this email already exists."))
                     elif not signup_password:
                         st.error(t("Please provide a password."))
                     else:
@@ -304,7 +657,7 @@ with st.sidebar:
                                 name=name,
                                 email=signup_email,
                                 password=signup_password,
-                                created_at=datetime.now(timezone.utc).isoformat()
+                                created_at=now_utc.isoformat(timespec="seconds")
                             )
                             st.session_state.user = load_user_by_email(signup_email)
                             st.session_state.authenticated = True
@@ -316,6 +669,7 @@ with st.sidebar:
         if st.button(t("Log out")):
             st.session_state.user = None
             st.session_state.authenticated = False
+            st.session_state.tx_page = 0
             st.rerun()
         st.session_state.currency = st.selectbox(t("💱 Currency"), options=["USD", "GBP", "EUR"], index=0, key="currency_select")
         language_label = st.selectbox(t("🌐 Language"), options=list(LANGUAGE_OPTIONS.keys()), index=0, key="language_select")
@@ -345,41 +699,57 @@ if st.session_state.authenticated and st.session_state.user:
         unsafe_allow_html=True
     )
 
-    price_cache = {}
-
     @st.cache_data(ttl=3600)
     def get_current_btc_price():
         url = "https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd"
         try:
-            response = requests.get(url, timeout=10)
+            response = get_http_session().get(url, timeout=10)
             response.raise_for_status()
             return response.json().get("bitcoin", {}).get("usd", 0)
         except Exception as e:
             logger.error(f"Error fetching BTC price: {e}")
             return 0
 
-    @st.cache_data(ttl=3600)
+    @st.cache_data(ttl=3600, max_entries=4096)
     def get_historical_price(date_str):
-        if date_str in price_cache:
-            return price_cache[date_str]
+        """BTC/USD price for a DD-MM-YYYY date; raises on failure so only real prices are cached."""
+        dt = datetime.strptime(date_str, '%d-%m-%Y')
+        ts = int(dt.replace(tzinfo=UTC).timestamp())
+        url = f"https://min-api.cryptocompare.com/data/pricehistorical?fsym=BTC&tsyms=USD&ts={ts}"
+        response = get_http_session().get(url, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        # CryptoCompare reports errors, including rate limits, as HTTP 200 with Response == "Error"
+        price = data.get("BTC", {}).get("USD") if data.get("Response") != "Error" else None
+        if price is None:
+            raise ValueError(data.get("Message", "no BTC/USD price in response"))
+        return price
+
+    def historical_price_or_zero(date_str):
         try:
-            dt = datetime.strptime(date_str, '%d-%m-%Y')
-            ts = int(dt.replace(tzinfo=timezone.utc).timestamp())
-            url = f"https://min-api.cryptocompare.com/data/pricehistorical?fsym=BTC&tsyms=USD&ts={ts}"
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            price = response.json().get("BTC", {}).get("USD", 0)
-            price_cache[date_str] = price
-            return price
+            return get_historical_price(date_str)
         except Exception as e:
             logger.error(f"Error fetching historical price for {date_str}: {e}")
             return 0
 
+    @st.cache_data(ttl=86400)
+    def get_price_series(start_ts, end_ts):
+        """Closing BTC/USD price per DD-MM-YYYY day; raises on failure so errors are not cached."""
+        url = f"https://api.coingecko.com/api/v3/coins/bitcoin/market_chart/range?vs_currency=usd&from={start_ts}&to={end_ts}"
+        response = get_http_session().get(url, timeout=10)
+        response.raise_for_status()
+        prices = pd.DataFrame(response.json().get("prices", []), columns=["timestamp", "price"]).sort_values("timestamp")
+        # Granularity depends on the span (5-minute, hourly, or daily samples at 00:00 UTC), so price each
+        # day by its last sample up to and including the next midnight; a 00:00 sample closes the day before
+        day_ms = 86_400_000
+        days = pd.to_datetime((prices["timestamp"] - 1) // day_ms * day_ms, unit="ms").dt.strftime("%d-%m-%Y")
+        return dict(zip(days, prices["price"]))
+
     @st.cache_data(ttl=3600)
     def get_wallet_balance(address):
         url = f"https://blockstream.info/api/address/{address}"
         try:
-            response = requests.get(url, timeout=10)
+            response = get_http_session().get(url, timeout=10)
             response.raise_for_status()
             stats = response.json().get("chain_stats", {})
             funded = stats.get("funded_txo_sum", 0)
@@ -392,16 +762,16 @@ if st.session_state.authenticated and st.session_state.user:
             return 0
 
     @st.cache_data(ttl=3600)
-    def get_txs_all(address):
+    def get_txs_all(address, limit=20):
         all_txs = []
         url = f"https://blockstream.info/api/address/{address}/txs"
         try:
             logger.info(f"Fetching transactions for address: {address}")
-            response = requests.get(url, timeout=10)
+            response = get_http_session().get(url, timeout=10)
             response.raise_for_status()
             txs = response.json()
-            all_txs.extend(txs[:20])
-            logger.info(f"Fetched {len(all_txs)} transactions (limited to 20)")
+            all_txs.extend(txs[:limit])
+            logger.info(f"Fetched {len(all_txs)} transactions (limited to {limit})")
             if not all_txs:
                 logger.warning(f"No transactions found for address: {address}")
             return all_txs
@@ -409,11 +779,11 @@ if st.session_state.authenticated and st.session_state.user:
             logger.error(f"Error fetching transactions for {address}: {e}")
             return []
 
-    @st.cache_data(ttl=3600)
+    @st.cache_data(ttl=3600, show_spinner=False)
     def get_tx_details(txid):
         url = f"https://blockstream.info/api/tx/{txid}"
         try:
-            response = requests.get(url, timeout=10)
+            response = get_http_session().get(url, timeout=10)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -424,7 +794,7 @@ if st.session_state.authenticated and st.session_state.user:
     def get_btc_historical_prices(days=30):
         url = f"https://api.coingecko.com/api/v3/coins/bitcoin/market_chart?vs_currency=usd&days={days}"
         try:
-            response = requests.get(url, timeout=10)
+            response = get_http_session().get(url, timeout=10)
             response.raise_for_status()
             prices = response.json().get("prices", [])
             return pd.DataFrame(prices, columns=["timestamp", "price"]).assign(
@@ -438,7 +808,7 @@ if st.session_state.authenticated and st.session_state.user:
     def get_currency_rates():
         url = "https://api.frankfurter.app/latest?from=USD&to=USD,GBP,EUR"
         try:
-            response = requests.get(url, timeout=10)
+            response = get_http_session().get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
             rates = data.get("rates", {})
@@ -449,66 +819,201 @@ if st.session_state.authenticated and st.session_state.user:
             logger.error(f"Error fetching currency rates: {e}")
             return {"USD": 1.0, "GBP": 0.78, "EUR": 0.92}
 
-    def get_wallet_stats(address):
-        txs = get_txs_all(address)
-        data = []
-        total_btc_in = total_btc_out = total_usd_in = total_usd_out = 0
-        first_tx_date = None
+    @st.cache_data(ttl=300, show_spinner=False)
+    def get_wallet_stats(address, limit=20):
+        txs = get_txs_all(address, limit)
 
-        for tx in txs:
-            txid = tx.get("txid")
-            detail = get_tx_details(txid)
+        txids = [tx.get("txid") for tx in txs]
+        # The /txs listing already embeds vin (with prevouts), vout and status; only fetch details it lacks
+        missing = [txid for txid, tx in zip(txids, txs) if "vin" not in tx or "vout" not in tx]
+        fetched = dict(zip(missing, map_concurrently(get_tx_details, missing)))
+        details = [fetched[txid] if txid in fetched else tx for txid, tx in zip(txids, txs)]
+        for txid, detail in zip(txids, details):
             if not detail:
                 logger.warning(f"No details for txid: {txid}")
-                continue
-            ts = detail.get("status", {}).get("block_time", int(time.time()))
-            date = datetime.fromtimestamp(ts, tz=timezone.utc)
-            date_str = date.strftime("%d-%m-%Y")
-            if not first_tx_date or date < first_tx_date:
-                first_tx_date = date
-            btc_price = get_historical_price(date_str)
-            confirmed = detail.get("status", {}).get("confirmed", False)
-
-            btc_in = sum(v.get("value", 0) for v in detail.get("vout", []) if v.get("scriptpubkey_address") == address) / 1e8
-            btc_out = 0
-            for vin in detail.get("vin", []):
-                prevout = vin.get("prevout", {})
-                if prevout.get("scriptpubkey_address") == address:
-                    input_value = prevout.get("value", 0) / 1e8
-                    change_value = sum(v.get("value", 0) for v in detail.get("vout", []) if v.get("scriptpubkey_address") == address) / 1e8
-                    btc_out += max(0, input_value - change_value)
-            counterparties = [
-                vin.get("prevout", {}).get("scriptpubkey_address", "") for vin in detail.get("vin", []) if vin.get("prevout", {}).get("scriptpubkey_address") != address
-            ] or [
-                v.get("scriptpubkey_address") for v in detail.get("vout", []) if v.get("scriptpubkey_address") != address
-            ]
-            counterparty = counterparties[0] if counterparties else "N/A"
-
-            if btc_in > 0:
-                usd_in = btc_in * btc_price
-                total_btc_in += btc_in
-                total_usd_in += usd_in
-                data.append([date_str, "IN", btc_in, btc_price, usd_in, txid, confirmed, counterparty])
-            if btc_out > 0:
-                usd_out = btc_out * btc_price
-                total_btc_out += btc_out
-                total_usd_out += usd_out
-                data.append([date_str, "OUT", btc_out, btc_price, usd_out, txid, confirmed, counterparty])
-
-            logger.debug(f"Tx {txid}: IN={btc_in:.8f}, OUT={btc_out:.8f}, Price={btc_price:.2f}")
-
-        df = pd.DataFrame(data, columns=["Date", "Type", "BTC", "Price at Tx", "USD Value", "Txid", "Confirmed", "Counterparty"])
-        if not df.empty:
-            df["Date"] = pd.to_datetime(df["Date"], format="%d-%m-%Y")
-            df["Type"] = df["Type"].astype(str)
-            df["BTC"] = df["BTC"].astype(float)
-            df["Price at Tx"] = df["Price at Tx"].astype(float)
-            df["USD Value"] = df["USD Value"].astype(float)
-        else:
+        txids = [txid for txid, detail in zip(txids, details) if detail]
+        details = [detail for detail in details if detail]
+        n = len(details)
+
+        now_ts = int(time.time())
+        timestamps = np.array([detail.get("status", {}).get("block_time", now_ts) for detail in details], dtype=np.int64)
+        tx_dates = pd.to_datetime(timestamps, unit="s", utc=True)
+        date_strs = tx_dates.strftime("%d-%m-%Y")
+        first_tx_date = tx_dates.min() if n else None
+
+        # One range request covers every tx date through the midnight that closes the last one; round to
+        # whole days so the cache key is stable
+        price_series = {}
+        if n:
+            try:
+                price_series = get_price_series(
+                    int(timestamps.min()) // 86400 * 86400, (int(timestamps.max()) // 86400 + 1) * 86400
+                )
+            except Exception as e:
+                logger.error(f"Error fetching BTC price series: {e}")
+        price_by_date = {d: price_series.get(d) or historical_price_or_zero(d) for d in set(date_strs)}
+        tx_prices = np.array([price_by_date[d] for d in date_strs], dtype=float)
+
+        # Flatten outputs and spent prevouts into (tx position, address, sats) rows
+        vouts = pd.DataFrame(
+            [(i, v.get("scriptpubkey_address"), v.get("value", 0)) for i, detail in enumerate(details) for v in detail.get("vout", [])],
+            columns=["tx", "address", "value"]
+        )
+        vins = pd.DataFrame(
+            [
+                (i, prevout.get("scriptpubkey_address", ""), prevout.get("value", 0))
+                for i, detail in enumerate(details)
+                for prevout in ((vin.get("prevout") or {}) for vin in detail.get("vin", []))
+            ],
+            columns=["tx", "address", "value"]
+        )
+        own_vouts = vouts[vouts["address"] == address]
+        own_vins = vins[vins["address"] == address]
+        own_vin_tx = own_vins["tx"].to_numpy(dtype=np.int64)
+
+        btc_in = np.bincount(
+            own_vouts["tx"].to_numpy(dtype=np.int64), weights=own_vouts["value"].to_numpy(dtype=float), minlength=n
+        ) / 1e8
+        # Outputs back to this address are change, so btc_in doubles as the change value
+        spent = np.maximum(own_vins["value"].to_numpy(dtype=float) / 1e8 - btc_in[own_vin_tx], 0)
+        btc_out = np.bincount(own_vin_tx, weights=spent, minlength=n)
+
+        # Prefer the first foreign input address, falling back to the first foreign output address
+        counterparty = pd.Series("N/A", index=range(n), dtype=object)
+        counterparty.update(vouts[vouts["address"] != address].groupby("tx")["address"].first())
+        counterparty.update(vins[vins["address"] != address].groupby("tx")["address"].first())
+
+        per_tx = pd.DataFrame({
+            "Date": tx_dates.tz_localize(None).normalize(),
+            "Price at Tx": tx_prices,
+            "Txid": txids,
+            "Confirmed": [bool(detail.get("status", {}).get("confirmed", False)) for detail in details],
+            "Counterparty": counterparty.to_numpy(),
+        })
+        df = pd.concat([
+            per_tx.assign(Type="IN", BTC=btc_in)[btc_in > 0],
+            per_tx.assign(Type="OUT", BTC=btc_out)[btc_out > 0],
+        ]).sort_index(kind="stable").sort_values("Date", kind="stable").reset_index(drop=True)
+        df["USD Value"] = df["BTC"] * df["Price at Tx"]
+        df = df[list(TRANSACTION_COLUMNS)].astype({"Type": "category"})
+        if df.empty:
             logger.warning(f"No transaction data for address: {address}")
 
+        total_btc_in = float(btc_in.sum())
+        total_btc_out = float(btc_out.sum())
+        total_usd_in = float((btc_in * tx_prices).sum())
+        total_usd_out = float((btc_out * tx_prices).sum())
         return df, total_btc_in, total_btc_out, total_usd_in, total_usd_out, first_tx_date
 
+    @st.fragment
+    def render_summary_tab(net_btc, wallet_value, gain, gain_pct, volatility, avg_buy, invested, holding_period_days, sharpe_ratio):
+        st.markdown(f"### 💼 {t('Wallet Overview')}")
+        currency = st.session_state.currency
+        render_metric_grid([
+            (t("Bitcoin Balance"), f"{net_btc:.8f} BTC", t("Total Bitcoin in your wallet"), None),
+            (f"{t('Current Value')} ({currency})", f"{wallet_value:,.2f}", t("Current market value of your Bitcoin"), None),
+            (f"{t('Profit/Loss')} ({currency})", f"{gain:.2f}", t("Unrealized profit or loss"), gain_pct),
+            (t("30-Day Volatility"), f"{volatility:.2f}%", t("Annualized price volatility of Bitcoin"), None),
+            (f"{t('Average Buy Price')} ({currency})", f"{avg_buy:.2f}", t("Average price paid per Bitcoin"), None),
+            (f"{t('Total Invested')} ({currency})", f"{invested:.2f}", t("Total amount invested"), None),
+            (t("Holding Period"), f"{holding_period_days} days", t("Days since first transaction"), None),
+            (t("Sharpe Ratio"), f"{sharpe_ratio:.2f}", t("Risk-adjusted return"), None),
+        ])
+
+        st.markdown(f"### 📊 {t('Summary Metrics')}")
+        summary_df = build_summary_df(
+            net_btc, wallet_value, invested, gain, gain_pct, volatility, sharpe_ratio,
+            st.session_state.currency, st.session_state.language
+        )
+        st.dataframe(
+            summary_df,
+            use_container_width=True,
+            column_config={t("Value"): st.column_config.NumberColumn(format="%.10g")}
+        )
+
+    def reset_tx_page():
+        st.session_state.tx_page = 0
+
+    @st.fragment
+    def render_transactions_tab(df, multiplier):
+        st.markdown(f"### 📜 {t('Transaction History')}")
+        if not df.empty:
+            # df is sorted by Date, so the bounds are its first and last rows
+            first_date, last_date = df["Date"].iloc[0].date(), df["Date"].iloc[-1].date()
+            date_range = st.date_input(
+                t("Date Range"),
+                [first_date, last_date],
+                min_value=first_date,
+                max_value=last_date,
+                key="date_range",
+                on_change=reset_tx_page
+            )
+            # The range is a contiguous slice; date_range holds a single date while the user is
+            # still picking the end of the range
+            dates = df["Date"].to_numpy()
+            start = dates.searchsorted(np.datetime64(date_range[0]), side="left")
+            end = dates.searchsorted(np.datetime64(date_range[-1]), side="right")
+            filtered_df = df.iloc[start:end]
+        else:
+            date_range = st.date_input(
+                t("Date Range"),
+                [today - timedelta(days=30), today],
+                key="date_range",
+                disabled=True
+            )
+            filtered_df = df
+
+        page_count = max(1, -(-len(filtered_df) // TX_PAGE_SIZE))
+        page = min(st.session_state.tx_page, page_count - 1)
+        page_df = filtered_df.iloc[page * TX_PAGE_SIZE:(page + 1) * TX_PAGE_SIZE]
+        page_df = page_df.assign(**{
+            "Date": page_df["Date"].dt.strftime("%Y-%m-%d"),
+            "USD Value": page_df["USD Value"] * multiplier,
+        })
+        st.dataframe(
+            page_df,
+            use_container_width=True
+        )
+        if page_count > 1:
+            prev_col, page_col, next_col = st.columns([1, 2, 1])
+            if prev_col.button(t("Previous"), disabled=page == 0, key="tx_prev"):
+                st.session_state.tx_page = page - 1
+                st.rerun(scope="fragment")
+            page_col.caption(f"{t('Page')} {page + 1} / {page_count}")
+            if next_col.button(t("Next"), disabled=page >= page_count - 1, key="tx_next"):
+                st.session_state.tx_page = page + 1
+                st.rerun(scope="fragment")
+
+        st.download_button(
+            t("Download Transactions as CSV"),
+            to_csv_bytes(filtered_df, multiplier),
+            "transactions.csv",
+            "text/csv",
+            key="download_transactions_csv"
+        )
+
+        st.markdown(f"### 📈 {t('Transaction Volume')}")
+        daily_activity = get_daily_activity(filtered_df)
+        fig_volume = build_volume_figure(daily_activity, st.session_state.language)
+        st.plotly_chart(fig_volume, use_container_width=True, theme=None, config=STATIC_PLOTLY_CONFIG)
+
+        st.markdown(f"### 📉 {t('Transaction Frequency')}")
+        fig_freq = build_frequency_figure(daily_activity, st.session_state.language)
+        st.plotly_chart(fig_freq, use_container_width=True, theme=None, config=STATIC_PLOTLY_CONFIG)
+
+    @st.fragment
+    def render_portfolio_tab(value_df, gain_pct, current_price, max_drawdown):
+        st.markdown(f"### 📈 {t('Portfolio Performance')}")
+        fig_portfolio = build_portfolio_figure(value_df, st.session_state.currency, st.session_state.language)
+        st.plotly_chart(fig_portfolio, use_container_width=True, config=PLOTLY_CONFIG)
+
+        st.markdown(f"### 📊 {t('Performance Metrics')}")
+        col1, col2, col3 = st.columns(3)
+        col1.metric(t("ROI"), f"{gain_pct:.2f}%", help=t("Return on investment"))
+        col2.metric(f"{t('Current BTC Price')} ({st.session_state.currency})", f"{st.session_state.currency} {current_price:,.2f}", help=t("Current market price"))
+        col3.metric(t("Max Drawdown"), f"{max_drawdown:.2f}%", help=t("Maximum portfolio value drop"))
+
+
     currency_rates = get_currency_rates()
     multiplier = currency_rates.get(st.session_state.currency.upper(), 1.0)
 
@@ -539,178 +1044,29 @@ if st.session_state.authenticated and st.session_state.user:
                 gain = 0
                 gain_pct = 0
 
-            holding_period_days = (datetime.now(timezone.utc) - first_tx_date).days if first_tx_date else 0
+            holding_period_days = (now_utc - first_tx_date).days if first_tx_date else 0
             historical_prices = get_btc_historical_prices()
-            volatility = historical_prices["price"].pct_change().std() * np.sqrt(252) * 100 if not historical_prices.empty else 0
-            btc_return = (historical_prices["price"].iloc[-1] / historical_prices["price"].iloc[0] - 1) * 100 if not historical_prices.empty else 0
-            sharpe_ratio = (gain_pct / volatility) * np.sqrt(252) if volatility != 0 else 0
-
-            value_data = []
-            cost_basis = 0
-            for date in sorted(df["Date"].unique()):
-                date_df = df[df["Date"] == date]
-                net_btc_date = sum(df[df["Type"] == "IN"]["BTC"]) - sum(df[df["Type"] == "OUT"]["BTC"])
-                cost_basis += date_df[date_df["Type"] == "IN"]["USD Value"].sum() - date_df[date_df["Type"] == "OUT"]["USD Value"].sum()
-                date_str = pd.to_datetime(date).strftime("%d-%m-%Y")
-                price = get_historical_price(date_str)
-                value = net_btc_date * price * multiplier
-                value_data.append({"Date": date, "Market Value": value, "Cost Basis": cost_basis * multiplier})
-            value_df = pd.DataFrame(value_data)
-            max_drawdown = (
-                (value_df["Market Value"] - value_df["Market Value"].cummax()) / value_df["Market Value"].cummax()
-            ).min() * 100 if not value_df.empty else 0
+            value_df = compute_portfolio_value(df, multiplier)
+            risk = compute_risk_metrics(
+                historical_prices["price"].to_numpy(dtype=float) if not historical_prices.empty else np.empty(0),
+                value_df["Market Value"].to_numpy(dtype=float),
+                gain_pct
+            )
+            volatility = risk["volatility"]
+            btc_return = risk["btc_return"]
+            sharpe_ratio = risk["sharpe_ratio"]
+            max_drawdown = risk["max_drawdown"]
 
             tab1, tab2, tab3 = st.tabs([t("Summary"), t("Transactions"), t("Portfolio")])
 
             with tab1:
-                st.markdown(f"### 💼 {t('Wallet Overview')}")
-                col1, col2, col3, col4 = st.columns(4)
-                col1.metric(t("Bitcoin Balance"), f"{net_btc:.8f} BTC", help=t("Total Bitcoin in your wallet"))
-                col2.metric(f"{t('Current Value')} ({st.session_state.currency})", f"{wallet_value:,.2f}", help=t("Current market value of your Bitcoin"))
-                col3.metric(f"{t('Profit/Loss')} ({st.session_state.currency})", f"{gain:.2f}", delta=f"{gain_pct:.2f}%", help=t("Unrealized profit or loss"))
-                col4.metric(t("30-Day Volatility"), f"{volatility:.2f}%", help=t("Annualized price volatility of Bitcoin"))
-
-                col5, col6, col7, col8 = st.columns(4)
-                col5.metric(f"{t('Average Buy Price')} ({st.session_state.currency})", f"{avg_buy:.2f}", help=t("Average price paid per Bitcoin"))
-                col6.metric(f"{t('Total Invested')} ({st.session_state.currency})", f"{invested:.2f}", help=t("Total amount invested"))
-                col7.metric(t("Holding Period"), f"{holding_period_days} days", help=t("Days since first transaction"))
-                col8.metric(t("Sharpe Ratio"), f"{sharpe_ratio:.2f}", help=t("Risk-adjusted return"))
-
-                st.markdown(f"### 📊 {t('Summary Metrics')}")
-                summary_data = {
-                    t("Metric"): [
-                        t("Bitcoin Balance"),
-                        t("Current Value"),
-                        t("Total Invested"),
-                        t("Profit/Loss"),
-                        t("ROI"),
-                        t("Volatility"),
-                        t("Sharpe Ratio")
-                    ],
-                    t("Value"): [
-                        f"{net_btc:.8f} BTC",
-                        f"{st.session_state.currency} {wallet_value:.2f}",
-                        f"{st.session_state.currency} {invested:.2f}",
-                        f"{st.session_state.currency} {gain:.2f}",
-                        f"{gain_pct:.2f}%",
-                        f"{volatility:.2f}%",
-                        f"{sharpe_ratio:.2f}"
-                    ]
-                }
-                st.dataframe(pd.DataFrame(summary_data), use_container_width=True)
-
-            with tab2:
-                st.markdown(f"### 📜 {t('Transaction History')}")
-                df_display = df.copy()
-                df_display["USD Value"] = df_display["USD Value"] * multiplier
-                df_display["Date"] = df_display["Date"].dt.strftime("%Y-%m-%d")
-
-                if not df.empty:
-                    date_range = st.date_input(
-                        t("Date Range"),
-                        [df["Date"].min(), df["Date"].max()],
-                        min_value=df["Date"].min(),
-                        max_value=df["Date"].max(),
-                        key="date_range"
-                    )
-                    filtered_df = df_display[
-                        (df_display["Date"] >= date_range[0].strftime("%Y-%m-%d")) &
-                        (df_display["Date"] <= date_range[1].strftime("%Y-%m-%d"))
-                    ]
-                else:
-                    date_range = st.date_input(
-                        t("Date Range"),
-                        [date.today() - timedelta(days=30), date.today()],
-                        key="date_range",
-                        disabled=True
-                    )
-                    filtered_df = pd.DataFrame()
-
-                st.dataframe(
-                    filtered_df[["Date", "Type", "BTC", "USD Value", "Price at Tx", "Txid", "Confirmed", "Counterparty"]],
-                    use_container_width=True
-                )
-
-                csv = filtered_df.to_csv(index=False)
-                st.download_button(
-                    t("Download Transactions as CSV"),
-                    csv,
-                    "transactions.csv",
-                    "text/csv",
-                    key="download_transactions_csv"
-                )
-
-                st.markdown(f"### 📈 {t('Transaction Volume')}")
-                volume_df = filtered_df.groupby("Date")["BTC"].sum().reset_index()
-                fig_volume = go.Figure()
-                fig_volume.add_trace(
-                    go.Bar(
-                        x=volume_df["Date"],
-                        y=volume_df["BTC"],
-                        name=t("BTC Volume"),
-                        marker_color="#007BFF"
-                    )
-                )
-                fig_volume.update_layout(
-                    title=t("Transaction Volume Over Time"),
-                    xaxis_title=t("Date"),
-                    yaxis_title=t("BTC"),
-                    template="plotly_white"
-                )
-                st.plotly_chart(fig_volume, use_container_width=True)
-
-                st.markdown(f"### 📉 {t('Transaction Frequency')}")
-                freq_df = filtered_df.groupby("Date")["Txid"].count().reset_index(name="Count")
-                fig_freq = go.Figure()
-                fig_freq.add_trace(
-                    go.Scatter(
-                        x=freq_df["Date"],
-                        y=freq_df["Count"],
-                        mode="lines+markers",
-                        name=t("Transaction Count"),
-                        line=dict(color="#FF5733")
-                    )
+                render_summary_tab(
+                    net_btc, wallet_value, gain, gain_pct, volatility, avg_buy, invested, holding_period_days, sharpe_ratio
                 )
-                fig_freq.update_layout(
-                    title=t("Transaction Frequency Over Time"),
-                    xaxis_title=t("Date"),
-                    yaxis_title=t("Number of Transactions"),
-                    template="plotly_white"
-                )
-                st.plotly_chart(fig_freq, use_container_width=True)
-
+            with tab2:
+                render_transactions_tab(df, multiplier)
             with tab3:
-                st.markdown(f"### 📈 {t('Portfolio Performance')}")
-                fig_portfolio = go.Figure()
-                fig_portfolio.add_trace(
-                    go.Scatter(
-                        x=value_df["Date"],
-                        y=value_df["Market Value"],
-                        name=t("Market Value"),
-                        line=dict(color="#007BFF")
-                    )
-                )
-                fig_portfolio.add_trace(
-                    go.Scatter(
-                        x=value_df["Date"],
-                        y=value_df["Cost Basis"],
-                        name=t("Cost Basis"),
-                        line=dict(color="#FF5733")
-                    )
-                )
-                fig_portfolio.update_layout(
-                    title=t("Portfolio Value vs Cost Basis"),
-                    xaxis_title=t("Date"),
-                    yaxis_title=f"{st.session_state.currency}",
-                    template="plotly_white"
-                )
-                st.plotly_chart(fig_portfolio, use_container_width=True)
-
-                st.markdown(f"### 📊 {t('Performance Metrics')}")
-                col1, col2, col3 = st.columns(3)
-                col1.metric(t("ROI"), f"{gain_pct:.2f}%", help=t("Return on investment"))
-                col2.metric(f"{t('Current BTC Price')} ({st.session_state.currency})", f"{st.session_state.currency} {current_price:,.2f}", help=t("Current market price"))
-                col3.metric(t("Max Drawdown"), f"{max_drawdown:.2f}%", help=t("Maximum portfolio value drop"))
+                render_portfolio_tab(value_df, gain_pct, current_price, max_drawdown)
 else:
     st.markdown(
         """